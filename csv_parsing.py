@@ -0,0 +1,115 @@
+import csv
+import io
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# Intern identifier strings so repeated group/access names share one object
+def intern_name(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+# Set of the distinct values in a Series, each interned once
+def intern_set(values):
+    return set(map(intern_name, values.unique()))
+
+# Column names as used by the analysis (byte order mark, surrounding whitespace and quotes removed)
+def _clean_column_name(name):
+    return str(name).replace('\ufeff', '').strip().replace('"', '')
+
+# pyarrow parse/convert options for the sniffed dialect: every column is read as a string,
+# and only the wanted columns are converted
+def _arrow_csv_options(delimiter: str, quotechar: str, head: str, columns=None):
+    header = next(csv.reader(head.splitlines()[:1], delimiter=delimiter, quotechar=quotechar))
+    return {
+        'parse_options': pacsv.ParseOptions(delimiter=delimiter, quote_char=quotechar),
+        'convert_options': pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            include_columns=[name for name in header if _clean_column_name(name) in columns] if columns else None,
+            strings_can_be_null=True,
+        ),
+    }
+
+# Read CSV bytes with pyarrow's multithreaded reader, keeping every column as a string
+def _read_csv_arrow(data: bytes, delimiter: str, quotechar: str, head: str, columns=None) -> pd.DataFrame:
+    table = pacsv.read_csv(pa.BufferReader(data), **_arrow_csv_options(delimiter, quotechar, head, columns))
+    return table.to_pandas()
+
+# Detect the delimiter and quote character from a bounded head slice, trimmed to whole lines.
+# utf-8-sig drops the byte order mark Excel's "CSV UTF-8" export writes, as both parsers do
+def _sniff_dialect(data: bytes):
+    head = data[:8192].decode("utf-8-sig", "replace")
+    if len(data) > 8192:
+        head = head.rsplit('\n', 1)[0]
+    try:
+        dialect = csv.Sniffer().sniff(head, delimiters=",;\t|")
+        return head, dialect.delimiter, dialect.quotechar
+    except csv.Error:
+        return head, None, '"'  # Let pandas try to infer
+
+# pandas reader used when pyarrow can't take the file; only the python engine can infer
+# a delimiter, otherwise stay on the C parser
+def _read_csv_pandas(data: bytes, delimiter, quotechar, columns=None, **kwargs):
+    return pd.read_csv(
+        io.BytesIO(data),
+        sep=delimiter,
+        quotechar=quotechar,
+        engine='c' if delimiter else 'python',
+        usecols=(lambda name: _clean_column_name(name) in columns) if columns else None,
+        **kwargs,
+    )
+
+# Parse raw CSV bytes into a DataFrame; if columns is given, only those columns are converted
+def parse_csv_bytes(data: bytes, columns=None) -> pd.DataFrame:
+    head, delimiter, quotechar = _sniff_dialect(data)
+
+    df = None
+    if delimiter:
+        try:
+            df = _read_csv_arrow(data, delimiter, quotechar, head, columns)
+        except (pa.ArrowException, StopIteration):
+            df = None  # Fall back to the pandas parser below
+
+    if df is None:
+        df = _read_csv_pandas(data, delimiter, quotechar, columns, dtype=str)
+
+    # Clean column names
+    df.columns = df.columns.map(_clean_column_name)
+
+    return df
+
+# Column-name cleanup applied to every chunk of a streamed read
+def _clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk.columns = chunk.columns.map(_clean_column_name)
+    return chunk
+
+# Read CSV bytes in bounded chunks, so a large file never sits in memory as one DataFrame.
+# pyarrow streams record batches of about block_size bytes; the pandas chunked reader takes
+# over when pyarrow can't open the file
+def read_csv_chunks(data: bytes, columns=None, dtype=str, chunksize=500_000, block_size=64 << 20):
+    head, delimiter, quotechar = _sniff_dialect(data)
+
+    reader = None
+    if delimiter:
+        try:
+            reader = pacsv.open_csv(
+                pa.BufferReader(data),
+                read_options=pacsv.ReadOptions(block_size=block_size),
+                **_arrow_csv_options(delimiter, quotechar, head, columns),
+            )
+        except (pa.ArrowException, StopIteration):
+            reader = None  # Fall back to the pandas parser below
+
+    if reader is not None:
+        for batch in reader:
+            table = pa.Table.from_batches([batch])
+            if dtype == 'category':
+                # Dictionary-encode in Arrow so pandas receives categoricals directly
+                table = pa.table({name: column.dictionary_encode() for name, column in zip(table.column_names, table.columns)})
+            yield _clean_chunk(table.to_pandas())
+        return
+
+    with _read_csv_pandas(data, delimiter, quotechar, columns, dtype=dtype, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _clean_chunk(chunk)
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 import io
+import os
 import re
+import csv
+from csv_parsing import intern_name, intern_set, parse_csv_bytes, read_csv_chunks
 
 # Set page configuration
 st.set_page_config(
@@ -43,13 +46,6 @@ st.markdown("""
         border-bottom: 2px solid #90CAF9;
         padding-bottom: 0.5rem;
     }
-    .card {
-        background-color: #F5F7FA;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        margin-bottom: 20px;
-    }
     .info-text {
         background-color: #E1F5FE;
         border-left: 5px solid #03A9F4;
@@ -60,56 +56,116 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Columns read from each upload; anything else in the files is skipped while parsing
+USER_GROUPS_COLUMNS = ('USER_NAME', 'MAIN_GROUP', 'ADDL_GROUP')
+MASTER_USERS_GROUPS_COLUMNS = ('JNUSER', 'VHFROM')
+
+# Cached results hold access-control data: keep the last few uploads in memory, and write
+# them to Streamlit's on-disk cache only when ACCESS_ANALYZER_PERSIST_CACHE=1 is set
+CACHE_MAX_ENTRIES = 4
+CACHE_PERSIST = "disk" if os.environ.get("ACCESS_ANALYZER_PERSIST_CACHE") == "1" else None
+
+# ADDL_GROUP entries are separated by any whitespace or comma
+_ADDL_SPLIT_RE = re.compile(r'[,\s]+')
+
+# Parse raw CSV bytes into a DataFrame (cached on the file contents); if
+# columns is given, only those columns are converted
+@st.cache_data(show_spinner=False, persist=CACHE_PERSIST, max_entries=CACHE_MAX_ENTRIES)
+def _parse_csv_bytes(data: bytes, columns=None) -> pd.DataFrame:
+    return parse_csv_bytes(data, columns)
+
 # Load CSV file
-def load_csv(uploaded_file):
+def load_csv(uploaded_file, columns=None):
     if uploaded_file is not None:
         try:
-            content = uploaded_file.getvalue().decode("utf-8")
-            sample_line = content.split('\n')[0]
-            
-            if '\t' in sample_line:
-                delimiter = '\t'
-            elif ',' in sample_line:
-                delimiter = ','
-            else:
-                delimiter = None  # Let pandas try to infer
-                
-            df = pd.read_csv(io.StringIO(content), delimiter=delimiter)
-            df.columns = df.columns.str.strip().str.replace('"', '')
-            return df
+            return _parse_csv_bytes(uploaded_file.getvalue(), columns)
+        except Exception as e:
+            st.error(f"Error loading file: {e}")
+            return None
+    return None
+
+# Load user accesses from the master file
+def load_user_accesses(uploaded_file):
+    if uploaded_file is not None:
+        try:
+            return get_master_user_accesses(uploaded_file.getvalue())
         except Exception as e:
             st.error(f"Error loading file: {e}")
             return None
     return None
 
 # Extract user groups
+@st.cache_data(show_spinner=False)
 def get_user_groups(df):
     required_columns = ['USER_NAME', 'MAIN_GROUP', 'ADDL_GROUP']
     for col in required_columns:
         if col not in df.columns:
             st.error(f"Missing required column: {col}. Please check your file.")
             return {}
+    addl_groups = df['ADDL_GROUP'].fillna('').astype(str).str.split(_ADDL_SPLIT_RE)
     user_groups = {}
-    for _, row in df.iterrows():
-        groups = [row['USER_NAME'], row['MAIN_GROUP']] if pd.notna(row['MAIN_GROUP']) else [row['USER_NAME']]
-        if pd.notna(row['ADDL_GROUP']):
-            additional_groups = re.split(r'[,\s]+', str(row['ADDL_GROUP']))
-            groups.extend([g for g in additional_groups if g])
-        user_groups[row['USER_NAME']] = set(groups)
+    for user, main_group, additional_groups in zip(df['USER_NAME'], df['MAIN_GROUP'], addl_groups):
+        user = intern_name(user)
+        groups = {intern_name(g) for g in additional_groups if g}
+        groups.add(user)
+        if pd.notna(main_group):
+            groups.add(intern_name(main_group))
+        user_groups[user] = groups
     return user_groups
 
 # Extract user accesses
 def get_user_accesses(df):
+    user_accesses = {intern_name(user): set() for user in df['JNUSER'].unique()}
+    accesses = df.dropna(subset=['VHFROM']).groupby('JNUSER', observed=True)['VHFROM'].apply(intern_set)
+    user_accesses.update(accesses.to_dict())
+    return user_accesses
+
+# Aggregate user accesses from the master file one chunk at a time (cached on the file contents)
+@st.cache_data(show_spinner=False, persist=CACHE_PERSIST, max_entries=CACHE_MAX_ENTRIES)
+def get_master_user_accesses(master_bytes: bytes):
     user_accesses = {}
-    for _, row in df.iterrows():
-        user = row['JNUSER']
-        access = row['VHFROM'] if pd.notna(row['VHFROM']) else None
-        if user not in user_accesses:
-            user_accesses[user] = set()
-        if access:
-            user_accesses[user].add(access)
+    for chunk in read_csv_chunks(master_bytes, MASTER_USERS_GROUPS_COLUMNS, dtype='category'):
+        for user, accesses in get_user_accesses(chunk).items():
+            user_accesses.setdefault(user, set()).update(accesses)
     return user_accesses
 
+# Build an inverted index of access -> users holding it (cached on the master file contents)
+@st.cache_data(show_spinner=False)
+def get_access_users(master_bytes: bytes):
+    access_users = {}
+    for user, accesses in get_master_user_accesses(master_bytes).items():
+        for access in accesses:
+            access_users.setdefault(access, set()).add(user)
+    return access_users
+
+# Sorted list of every access in the master file, for the filter options
+@st.cache_data(show_spinner=False)
+def get_access_options(master_bytes: bytes):
+    return sorted(get_access_users(master_bytes))
+
+# Build the export table for users holding any of the selected accesses
+def get_filtered_users(user_groups, user_accesses, access_users, selected_accesses):
+    matching_users = set().union(*(access_users.get(access, ()) for access in selected_accesses))
+    
+    users, groups_col, accesses_col = [], [], []
+    for user, accesses in user_accesses.items():
+        if user in matching_users:
+            users.append(user)
+            groups_col.append(", ".join(sorted(user_groups.get(user, ()))))
+            accesses_col.append(", ".join(sorted(accesses)))
+    return pd.DataFrame({'User': users, 'Groups': groups_col, 'Accesses': accesses_col})
+
+# Write a DataFrame as CSV straight into a UTF-8 byte buffer, row by row
+def to_csv_bytes(df):
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+    writer = csv.writer(text, lineterminator='\n')
+    writer.writerow(df.columns)
+    writer.writerows(df.itertuples(index=False, name=None))
+    text.flush()
+    text.detach()
+    return buffer.getvalue()
+
 # Main Streamlit app logic
 def main():
     st.markdown('<h1 class="main-header">Access Export</h1>', unsafe_allow_html=True)
@@ -131,40 +187,27 @@ def main():
 
     if user_groups_file and master_users_groups_file:
         with st.spinner("Processing files..."):
-            user_groups_df = load_csv(user_groups_file)
-            master_users_groups_df = load_csv(master_users_groups_file)
+            user_groups_df = load_csv(user_groups_file, USER_GROUPS_COLUMNS)
+            user_accesses = load_user_accesses(master_users_groups_file)
 
-            if user_groups_df is not None and master_users_groups_df is not None:
+            if user_groups_df is not None and user_accesses is not None:
                 st.success("Files loaded successfully!")
                 
                 user_groups = get_user_groups(user_groups_df)
-                user_accesses = get_user_accesses(master_users_groups_df)
                 
-                all_accesses = set()
-                for accesses in user_accesses.values():
-                    all_accesses.update(accesses)
-                    
-                selected_accesses = st.multiselect("Select Accesses to Filter:", sorted(list(all_accesses)))
+                master_bytes = master_users_groups_file.getvalue()
+                access_users = get_access_users(master_bytes)
+                access_options = get_access_options(master_bytes)
+                selected_accesses = st.multiselect("Select Accesses to Filter:", access_options)
                 
                 if selected_accesses:
-                    filtered_data = []
-                    for user, accesses in user_accesses.items():
-                        if any(access in selected_accesses for access in accesses):
-                            groups = user_groups.get(user, set())
-                            filtered_data.append({
-                                'User': user,
-                                'Groups': ", ".join(sorted(groups)),
-                                'Accesses': ", ".join(sorted(accesses)),
-                            })
-                    
-                    filtered_df = pd.DataFrame(filtered_data)
+                    filtered_df = get_filtered_users(user_groups, user_accesses, access_users, selected_accesses)
                     st.dataframe(filtered_df)
                     
                     # Export data
-                    csv = filtered_df.to_csv(index=False).encode('utf-8')
                     st.download_button(
                         label="Download Filtered Access Report (CSV)",
-                        data=csv,
+                        data=to_csv_bytes(filtered_df),
                         file_name="filtered_access_report.csv",
                         mime="text/csv"
                     )
@@ -173,19 +216,18 @@ def main():
             else:
                 st.error("Error loading CSV files. Please check the file format and try again.")
     else:
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.markdown("""
-        ## Access Export Tool
+        with st.container(border=True):
+            st.markdown("""
+            ## Access Export Tool
         
-        This tool helps you export users with specific access rights.
+            This tool helps you export users with specific access rights.
         
-        1. **Upload the required files** using the sidebar.
-        2. **Select the access rights** you want to filter.
-        3. **View and download** the filtered results.
-        """)
-        st.markdown('</div>', unsafe_allow_html=True)
+            1. **Upload the required files** using the sidebar.
+            2. **Select the access rights** you want to filter.
+            3. **View and download** the filtered results.
+            """)
 
-    st.markdown("<div style='position: fixed; bottom: 0; width: 100%; text-align: center; font-size: 0.8em;'><p>Developed with ❤️ by Maitry Rawal</p></div>", unsafe_allow_html=True)
+    st.caption("Developed with ❤️ by Maitry Rawal")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import io
-import plotly.express as px
-import plotly.graph_objects as go
+import os
+import gzip
+import math
 from collections import Counter
-import numpy as np
 import re
+from csv_parsing import intern_name, intern_set, parse_csv_bytes, read_csv_chunks
 
 # Set page configuration
 st.set_page_config(
@@ -46,29 +50,6 @@ st.markdown("""
         border-bottom: 2px solid #90CAF9;
         padding-bottom: 0.5rem;
     }
-    .card {
-        background-color: #F5F7FA;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        margin-bottom: 20px;
-    }
-    .metric-card {
-        background-color: #E3F2FD;
-        border-radius: 10px;
-        padding: 15px;
-        text-align: center;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
-    }
-    .metric-value {
-        font-size: 2rem;
-        font-weight: bold;
-        color: #1565C0;
-    }
-    .metric-label {
-        font-size: 1rem;
-        color: #424242;
-    }
     .info-text {
         background-color: #E1F5FE;
         border-left: 5px solid #03A9F4;
@@ -91,31 +72,20 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Load CSV file
-def load_csv(uploaded_file):
-    if uploaded_file is not None:
-        try:
-            # Try to detect the delimiter
-            content = uploaded_file.getvalue().decode("utf-8")
-            sample_line = content.split('\n')[0]
-            
-            if '\t' in sample_line:
-                delimiter = '\t'
-            elif ',' in sample_line:
-                delimiter = ','
-            else:
-                delimiter = None  # Let pandas try to infer
-            
-            df = pd.read_csv(io.StringIO(content), delimiter=delimiter)
-            
-            # Clean column names
-            df.columns = df.columns.str.strip().str.replace('"', '')
-            
-            return df
-        except Exception as e:
-            st.error(f"Error loading file: {e}")
-            return None
-    return None
+# Columns read from each upload; anything else in the files is skipped while parsing
+USER_GROUPS_COLUMNS = ('USER_NAME', 'MAIN_GROUP', 'ADDL_GROUP')
+MASTER_USERS_GROUPS_COLUMNS = ('JNUSER', 'VHFROM')
+
+# Cached results hold access-control data: keep the last few uploads in memory, and write
+# them to Streamlit's on-disk cache only when ACCESS_ANALYZER_PERSIST_CACHE=1 is set
+CACHE_MAX_ENTRIES = 4
+CACHE_PERSIST = "disk" if os.environ.get("ACCESS_ANALYZER_PERSIST_CACHE") == "1" else None
+
+# Rows per page in the User Access Analysis table
+USERS_PER_PAGE = 50
+
+# ADDL_GROUP entries are separated by any whitespace or comma
+_ADDL_SPLIT_RE = re.compile(r'[,\s]+')
 
 # Extract user groups from the user_groups file
 def get_user_groups(df):
@@ -125,169 +95,342 @@ def get_user_groups(df):
             st.error(f"Missing required column: {col}. Please check your file.")
             return {}
 
+    addl_groups = df['ADDL_GROUP'].fillna('').astype(str).str.split(_ADDL_SPLIT_RE)
+    
     user_groups = {}
-    for _, row in df.iterrows():
-        groups = [row['MAIN_GROUP']] if pd.notna(row['MAIN_GROUP']) else []
-        if pd.notna(row['ADDL_GROUP']):
-            # Split by any whitespace or comma
-            additional_groups = re.split(r'[,\s]+', str(row['ADDL_GROUP']))
-            groups.extend([g for g in additional_groups if g])
-        user_groups[row['USER_NAME']] = set(groups)
+    for user, main_group, additional_groups in zip(df['USER_NAME'], df['MAIN_GROUP'], addl_groups):
+        user = intern_name(user)
+        groups = {intern_name(g) for g in additional_groups if g}
+        if pd.notna(main_group):
+            groups.add(intern_name(main_group))
+        user_groups[user] = groups
     return user_groups
 
+# Invert user groups into a group -> users index
+def get_group_users(user_groups):
+    group_users = {}
+    for user, groups in user_groups.items():
+        for group in groups:
+            group_users.setdefault(group, []).append(user)
+    return group_users
+
 # Extract group-to-access mappings from master_users_groups file
 def get_group_accesses(df):
-    group_accesses = {}
     # Filter rows where JNUSER starts with "GR"
     group_rows = df[df['JNUSER'].str.startswith('GR', na=False)]
     
-    for _, row in group_rows.iterrows():
-        group = row['JNUSER']
-        access = row['VHFROM'] if pd.notna(row['VHFROM']) else None
-        if group not in group_accesses:
-            group_accesses[group] = set()
-        if access:
-            group_accesses[group].add(access)
+    # Groups without any access rows still get an (empty) entry
+    group_accesses = {intern_name(group): set() for group in group_rows['JNUSER'].unique()}
+    accesses = group_rows.dropna(subset=['VHFROM']).groupby('JNUSER', observed=True)['VHFROM'].apply(intern_set)
+    group_accesses.update(accesses.to_dict())
     return group_accesses
 
+# Aggregate group, user and public accesses from the master file one chunk at a time
+def get_master_accesses(master_users_groups_bytes: bytes):
+    group_accesses, user_accesses, public_accesses = {}, {}, set()
+    for chunk in read_csv_chunks(master_users_groups_bytes, MASTER_USERS_GROUPS_COLUMNS, dtype='category'):
+        for group, accesses in get_group_accesses(chunk).items():
+            group_accesses.setdefault(group, set()).update(accesses)
+        for user, accesses in get_user_accesses(chunk).items():
+            user_accesses.setdefault(user, set()).update(accesses)
+        public_accesses.update(get_public_accesses(chunk))
+    
+    # Group and public accesses are read-only from here on; freeze them once so the
+    # expected-access unions can reuse them without copying
+    group_accesses = {group: frozenset(accesses) for group, accesses in group_accesses.items()}
+    return group_accesses, user_accesses, frozenset(public_accesses)
+
 # Get public accesses (default for all users)
 def get_public_accesses(df):
-    public_accesses = set()
-    public_rows = df[df['JNUSER'] == '*PUBLIC']
-    
-    for _, row in public_rows.iterrows():
-        access = row['VHFROM'] if pd.notna(row['VHFROM']) else None
-        if access:
-            public_accesses.add(access)
-    
-    return public_accesses
+    return intern_set(df.loc[df['JNUSER'] == '*PUBLIC', 'VHFROM'].dropna())
 
 # Extract all accesses for users and groups from master_users_groups file
 def get_user_accesses(df):
-    user_accesses = {}
-    for _, row in df.iterrows():
-        user = row['JNUSER']
-        access = row['VHFROM'] if pd.notna(row['VHFROM']) else None
-        
-        # Skip *PUBLIC entries as they're handled separately
-        if user == '*PUBLIC':
-            continue
-            
-        if user not in user_accesses:
-            user_accesses[user] = set()
-        if access:
-            user_accesses[user].add(access)
+    # Skip *PUBLIC entries as they're handled separately
+    user_rows = df[df['JNUSER'] != '*PUBLIC']
+    
+    # Users without any access rows still get an (empty) entry
+    user_accesses = {intern_name(user): set() for user in user_rows['JNUSER'].unique()}
+    accesses = user_rows.dropna(subset=['VHFROM']).groupby('JNUSER', observed=True)['VHFROM'].apply(intern_set)
+    user_accesses.update(accesses.to_dict())
     return user_accesses
 
+# Pre-sort each member set once so rendering only has to join. Distinct names are ranked
+# with one string sort; every set is then ordered by one lexsort over the integer ranks.
+def sort_members(mapping):
+    keys = list(mapping)
+    sizes = np.array([len(members) for members in mapping.values()], dtype=np.int64)
+    members = np.array([member for group in mapping.values() for member in group], dtype=object)
+    names = pd.Index(members).unique().sort_values()
+    ranks = names.get_indexer(members)
+    owners = np.repeat(np.arange(len(keys)), sizes)
+    ordered = members[np.lexsort((ranks, owners))]
+    return {key: tuple(chunk) for key, chunk in zip(keys, np.split(ordered, np.cumsum(sizes)[:-1]))}
+
+# (User, Access) pairs granted through group membership, expanded from int-coded arrays
+def get_granted_pairs(user_groups, group_accesses):
+    users = list(user_groups)
+    group_index = pd.Index(list(group_accesses))
+    granted = pd.Index([access for accesses in group_accesses.values() for access in accesses], dtype=object)
+    access_index = granted.unique()
+    if access_index.empty:
+        return pd.DataFrame({'User': [], 'Access': []})
+    
+    # Group -> access incidence in CSR form: group g grants access_codes[indptr[g]:indptr[g + 1]]
+    sizes = np.array([len(accesses) for accesses in group_accesses.values()], dtype=np.int64)
+    indptr = np.concatenate(([0], np.cumsum(sizes)))
+    access_codes = access_index.get_indexer(granted)
+    
+    # One (user, group) code pair per membership, dropping groups that grant nothing
+    member_users = np.repeat(np.arange(len(users)), [len(groups) for groups in user_groups.values()])
+    member_groups = group_index.get_indexer([group for groups in user_groups.values() for group in groups])
+    known = member_groups >= 0
+    member_users, member_groups = member_users[known], member_groups[known]
+    
+    # Expand each membership into its group's row of the matrix
+    counts = sizes[member_groups]
+    offsets = np.repeat(indptr[member_groups] - (np.cumsum(counts) - counts), counts)
+    pair_users = np.repeat(member_users, counts)
+    pair_accesses = access_codes[np.arange(counts.sum()) + offsets]
+    
+    # Deduplicate on a single int64 key, then decode back to names
+    keys = np.unique(pair_users * len(access_index) + pair_accesses)
+    return pd.DataFrame({
+        'User': np.array(users, dtype=object)[keys // len(access_index)],
+        'Access': access_index[keys % len(access_index)],
+    })
+
+# Expected accesses per user (public + group accesses)
+def get_expected_accesses(granted_pairs, public_accesses):
+    expected = granted_pairs.groupby('User')['Access'].apply(public_accesses.union)
+    return expected.to_dict()
+
 # Find extra accesses for users (beyond their group permissions and public access)
-def find_extra_accesses(user_groups, user_accesses, group_accesses, public_accesses):
-    extra_accesses = {}
-    for user, groups in user_groups.items():
-        # Start with public accesses that everyone has
-        all_expected_accesses = set(public_accesses)
-        
-        # Add group-based accesses
-        for group in groups:
-            if group in group_accesses:
-                all_expected_accesses.update(group_accesses[group])
-        
-        # Get actual user accesses
-        actual_accesses = user_accesses.get(user, set())
-        
-        # Find extra accesses
-        extra = actual_accesses - all_expected_accesses
-        if extra:
-            extra_accesses[user] = extra
+def find_extra_accesses(user_groups, user_accesses, granted_pairs, public_accesses):
+    # Every (user, access) pair actually held by a user from the user_groups file
+    held_pairs = pd.DataFrame(
+        [(user, access) for user in user_groups for access in user_accesses.get(user, ())],
+        columns=['User', 'Access']
+    )
+    
+    # Public accesses are expected for everyone
+    held_pairs = held_pairs[~held_pairs['Access'].isin(public_accesses)]
+    
+    # Encode each (user, access) pair as one int64 key so the anti-join compares integers only
+    user_index = pd.Index(list(user_groups))
+    access_index = pd.Index(pd.concat([held_pairs['Access'], granted_pairs['Access']]).unique())
+    
+    def pair_keys(pairs):
+        user_codes = user_index.get_indexer(pairs['User']).astype(np.int64)
+        return user_codes * len(access_index) + access_index.get_indexer(pairs['Access'])
     
-    return extra_accesses
+    # Anti-join: keep the held pairs that none of the user's groups grant
+    extra_pairs = held_pairs[~np.isin(pair_keys(held_pairs), pair_keys(granted_pairs))]
+    return extra_pairs.groupby('User', sort=False)['Access'].apply(set).to_dict()
+
+# Count how many sets each member appears in, without flattening them into a list
+def count_members(sets):
+    counter = Counter()
+    for members in sets:
+        counter.update(members)
+    return counter
 
 # Generate summary statistics
 def generate_summary_stats(user_groups, user_accesses, group_accesses, extra_accesses, public_accesses):
+    # Per-group and per-access user counts, shared with create_visualizations
+    group_counts = count_members(user_groups.values())
+    access_counts = count_members(user_accesses.values())
+    
     stats = {
         'total_users': len(user_groups),
         'total_groups': len(group_accesses),
         'users_with_extra_access': len(extra_accesses),
-        'total_unique_accesses': len(set().union(*[accesses for accesses in user_accesses.values()])),
+        'total_unique_accesses': len(access_counts),
         'public_accesses': len(public_accesses),
         'avg_group_per_user': sum(len(groups) for groups in user_groups.values()) / len(user_groups) if user_groups else 0,
         'avg_access_per_user': sum(len(accesses) for accesses in user_accesses.values()) / len(user_accesses) if user_accesses else 0,
         'avg_access_per_group': sum(len(accesses) for accesses in group_accesses.values()) / len(group_accesses) if group_accesses else 0,
+        'group_counts': group_counts,
+        'access_counts': access_counts,
     }
     
+    # Top 10 groups/accesses for the charts; the top 5 are a prefix of the same ranking
+    stats['top_groups'] = group_counts.most_common(10)
+    stats['top_accesses'] = access_counts.most_common(10)
+    
     # Most common groups
-    all_groups = [group for groups in user_groups.values() for group in groups]
-    stats['most_common_groups'] = Counter(all_groups).most_common(5)
+    stats['most_common_groups'] = stats['top_groups'][:5]
     
     # Most common accesses
-    all_accesses = [access for accesses in user_accesses.values() for access in accesses]
-    stats['most_common_accesses'] = Counter(all_accesses).most_common(5)
+    stats['most_common_accesses'] = stats['top_accesses'][:5]
     
     return stats
 
+# Build a bar chart from a Series of counts, keeping the Series order on the x axis
+def bar_chart(counts, x_label, y_label, title, color):
+    import altair as alt
+    
+    data = pd.DataFrame({x_label: counts.index, y_label: counts.values})
+    return alt.Chart(data, title=title).mark_bar(color=color).encode(
+        x=alt.X(f'{x_label}:N', sort=None),
+        y=alt.Y(f'{y_label}:Q'),
+    )
+
 # Create visualizations
 def create_visualizations(user_groups, user_accesses, group_accesses, extra_accesses, public_accesses, stats):
+    # Altair specs are much smaller than Plotly figures; import it only when charts are needed
+    import altair as alt
+    
     visualizations = {}
     
     # 1. Distribution of group counts per user
-    group_counts = [len(groups) for groups in user_groups.values()]
-    visualizations['group_distribution'] = px.histogram(
-        x=group_counts,
-        nbins=max(10, max(group_counts) if group_counts else 1),
-        labels={'x': 'Number of Groups', 'y': 'Number of Users'},
-        title='Distribution of Group Membership per User',
-        color_discrete_sequence=['#1E88E5']
+    group_counts = pd.Series([len(groups) for groups in user_groups.values()], dtype=int)
+    visualizations['group_distribution'] = bar_chart(
+        group_counts.value_counts().sort_index(),
+        'Number of Groups', 'Number of Users',
+        'Distribution of Group Membership per User',
+        '#1E88E5'
     )
-    visualizations['group_distribution'].update_layout(bargap=0.1)
     
     # 2. Distribution of access counts per user
-    access_counts = [len(accesses) for accesses in user_accesses.values()]
-    visualizations['access_distribution'] = px.histogram(
-        x=access_counts,
-        nbins=max(10, max(access_counts) if access_counts else 1),
-        labels={'x': 'Number of Accesses', 'y': 'Number of Users'},
-        title='Distribution of Access Rights per User',
-        color_discrete_sequence=['#43A047']
+    access_counts = pd.Series([len(accesses) for accesses in user_accesses.values()], dtype=int)
+    visualizations['access_distribution'] = bar_chart(
+        access_counts.value_counts().sort_index(),
+        'Number of Accesses', 'Number of Users',
+        'Distribution of Access Rights per User',
+        '#43A047'
     )
-    visualizations['access_distribution'].update_layout(bargap=0.1)
     
     # 3. Top 10 groups by number of users
-    group_user_counts = Counter([group for groups in user_groups.values() for group in groups])
-    top_groups = group_user_counts.most_common(10)
+    top_groups = stats['top_groups']
     if top_groups:
-        group_names, group_counts = zip(*top_groups)
-        visualizations['top_groups'] = px.bar(
-            x=group_names, 
-            y=group_counts,
-            labels={'x': 'Group', 'y': 'Number of Users'},
-            title='Top 10 Groups by User Count',
-            color_discrete_sequence=['#7E57C2']
+        visualizations['top_groups'] = bar_chart(
+            pd.Series(dict(top_groups)),
+            'Group', 'Number of Users',
+            'Top 10 Groups by User Count',
+            '#7E57C2'
         )
     
     # 4. Top 10 accesses
-    access_counts = Counter([access for accesses in user_accesses.values() for access in accesses])
-    top_accesses = access_counts.most_common(10)
+    top_accesses = stats['top_accesses']
     if top_accesses:
-        access_names, access_counts = zip(*top_accesses)
-        visualizations['top_accesses'] = px.bar(
-            x=access_names, 
-            y=access_counts,
-            labels={'x': 'Access', 'y': 'Number of Users'},
-            title='Top 10 Most Common Access Rights',
-            color_discrete_sequence=['#EF6C00']
+        visualizations['top_accesses'] = bar_chart(
+            pd.Series(dict(top_accesses)),
+            'Access', 'Number of Users',
+            'Top 10 Most Common Access Rights',
+            '#EF6C00'
         )
     
     # 5. Pie chart of users with extra access vs standard access
     users_with_extra = len(extra_accesses)
     users_with_standard = len(user_groups) - users_with_extra
-    visualizations['extra_access_pie'] = px.pie(
-        values=[users_with_standard, users_with_extra],
-        names=['Standard Access', 'Extra Access'],
-        title='Users with Extra Access vs. Standard Access',
-        color_discrete_sequence=['#4CAF50', '#F44336']
+    pie_data = pd.DataFrame({
+        'Access Type': ['Standard Access', 'Extra Access'],
+        'Number of Users': [users_with_standard, users_with_extra],
+    })
+    visualizations['extra_access_pie'] = alt.Chart(pie_data, title='Users with Extra Access vs. Standard Access').mark_arc().encode(
+        theta=alt.Theta('Number of Users:Q'),
+        color=alt.Color(
+            'Access Type:N',
+            scale=alt.Scale(domain=['Standard Access', 'Extra Access'], range=['#4CAF50', '#F44336'])
+        ),
     )
     
     return visualizations
 
+# Serialize a DataFrame to CSV bytes with Arrow's multithreaded writer
+def to_csv_bytes(df):
+    buffer = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+# Run the full analysis on the uploaded file contents (cached on the raw bytes, and
+# optionally persisted to disk so the same files are not re-parsed after a restart)
+@st.cache_data(show_spinner=False, persist=CACHE_PERSIST, max_entries=CACHE_MAX_ENTRIES)
+def run_analysis(user_groups_bytes: bytes, master_users_groups_bytes: bytes):
+    # Extract data
+    user_groups = get_user_groups(parse_csv_bytes(user_groups_bytes, USER_GROUPS_COLUMNS))
+    group_users = get_group_users(user_groups)
+    group_accesses, user_accesses, public_accesses = get_master_accesses(master_users_groups_bytes)
+    
+    # Sorted views used for display; the sets above stay in use for set algebra
+    group_accesses_sorted = sort_members(group_accesses)
+    
+    # Find extra accesses (considering public access)
+    granted_pairs = get_granted_pairs(user_groups, group_accesses)
+    extra_accesses = find_extra_accesses(user_groups, user_accesses, granted_pairs, public_accesses)
+    expected_accesses = get_expected_accesses(granted_pairs, public_accesses)
+    
+    # Generate statistics
+    stats = generate_summary_stats(user_groups, user_accesses, group_accesses, extra_accesses, public_accesses)
+    
+    # Display string of each user's extra accesses, formatted once for every table below
+    extra_lookup = {user: ", ".join(accesses) for user, accesses in sort_members(extra_accesses).items()}
+    
+    # Users with extra access table, built column by column
+    extra_users = list(extra_accesses)
+    extra_groups_sorted = sort_members({user: user_groups.get(user, ()) for user in extra_users})
+    extra_df = pd.DataFrame({
+        'User': extra_users,
+        'Extra Accesses': [extra_lookup[user] for user in extra_users],
+        'Extra Access Count': [len(extra_accesses[user]) for user in extra_users],
+        'Assigned Groups': [", ".join(extra_groups_sorted[user]) for user in extra_users],
+        'Group Count': [len(user_groups.get(user, ())) for user in extra_users],
+        'Total Access Count': [len(user_accesses.get(user, ())) for user in extra_users],
+    })
+    extra_df = extra_df.sort_values('Extra Access Count', ascending=False)
+    
+    # Group-to-access table
+    groups = list(group_accesses)
+    group_df = pd.DataFrame({
+        'Group': groups,
+        'Access Count': [len(group_accesses[group]) for group in groups],
+        'Users in Group': [len(group_users.get(group, ())) for group in groups],
+    })
+    group_df = group_df.sort_values(['Users in Group', 'Access Count'], ascending=False)
+    
+    # Per-user table, filtered by the search box at render time
+    users = list(user_groups)
+    user_df = pd.DataFrame({
+        'User': users,
+        'Group Count': [len(user_groups[user]) for user in users],
+        'Access Count': [len(user_accesses.get(user, ())) for user in users],
+        'Has Extra Access': [user in extra_accesses for user in users],
+        'Extra Access Count': [len(extra_accesses.get(user, ())) for user in users],
+    })
+    user_df = user_df.sort_values(['Has Extra Access', 'Access Count'], ascending=[False, False])
+    
+    return {
+        'user_groups': user_groups,
+        'group_users': group_users,
+        'group_accesses': group_accesses,
+        'user_accesses': user_accesses,
+        'public_accesses': public_accesses,
+        'group_accesses_sorted': group_accesses_sorted,
+        'public_accesses_sorted': tuple(sorted(public_accesses)),
+        'extra_accesses': extra_accesses,
+        'expected_accesses': expected_accesses,
+        'extra_lookup': extra_lookup,
+        'stats': stats,
+        'extra_df': extra_df,
+        'group_df': group_df,
+        'user_df': user_df,
+        # Gzipped CSV of the extra-access table, ready for the download button
+        'extra_report': gzip.compress(to_csv_bytes(extra_df)),
+    }
+
+# Display strings for the given users only; the user table formats just its visible page
+def format_user_details(users, user_groups, user_accesses, expected_accesses, extra_lookup, public_accesses):
+    groups = sort_members({user: user_groups[user] for user in users})
+    accesses = sort_members({user: user_accesses.get(user, ()) for user in users})
+    expected = sort_members({user: expected_accesses.get(user, public_accesses) for user in users})
+    return pd.DataFrame({
+        'Groups': [", ".join(groups[user]) for user in users],
+        'Accesses': [", ".join(accesses[user]) for user in users],
+        'Extra Accesses': [extra_lookup.get(user, "") for user in users],
+        'Expected Accesses': [", ".join(expected[user]) for user in users],
+    }, index=users)
+
 # Main Streamlit app logic
 def main():
     st.markdown('<h1 class="main-header">🔐 User Access Analyzer</h1>', unsafe_allow_html=True)
@@ -320,263 +463,218 @@ def main():
 
     # Main content
     if user_groups_file and master_users_groups_file:
-        with st.spinner("Processing files..."):
-            # Load files
-            user_groups_df = load_csv(user_groups_file)
-            master_users_groups_df = load_csv(master_users_groups_file)
+        # Results are only valid for the files they were computed from
+        uploaded_files = (user_groups_file.file_id, master_users_groups_file.file_id)
+        
+        if st.button("Analyze", type="primary"):
+            with st.spinner("Processing files..."):
+                try:
+                    analysis = run_analysis(user_groups_file.getvalue(), master_users_groups_file.getvalue())
+                except Exception as e:
+                    analysis = None
+                    st.error(f"Error loading file: {e}")
 
-            if user_groups_df is not None and master_users_groups_df is not None:
-                st.success("Files loaded successfully!")
-                
-                # Extract data
-                user_groups = get_user_groups(user_groups_df)
-                group_accesses = get_group_accesses(master_users_groups_df)
-                user_accesses = get_user_accesses(master_users_groups_df)
-                public_accesses = get_public_accesses(master_users_groups_df)
-                
-                # Find extra accesses (considering public access)
-                extra_accesses = find_extra_accesses(user_groups, user_accesses, group_accesses, public_accesses)
-                
-                # Generate statistics
-                stats = generate_summary_stats(user_groups, user_accesses, group_accesses, extra_accesses, public_accesses)
-                
-                # Create visualizations
-                visualizations = create_visualizations(user_groups, user_accesses, group_accesses, extra_accesses, public_accesses, stats)
-                
-                # Display dashboard
-                st.markdown('<h2 class="sub-header">Dashboard Overview</h2>', unsafe_allow_html=True)
-                
-                # Key metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{}</div><div class="metric-label">Total Users</div></div>'.format(stats['total_users']), unsafe_allow_html=True)
-                with col2:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{}</div><div class="metric-label">Total Groups</div></div>'.format(stats['total_groups']), unsafe_allow_html=True)
-                with col3:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{}</div><div class="metric-label">Users with Extra Access</div></div>'.format(stats['users_with_extra_access']), unsafe_allow_html=True)
-                with col4:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{}</div><div class="metric-label">Public Accesses</div></div>'.format(stats['public_accesses']), unsafe_allow_html=True)
-                
-                # Second row of metrics
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{:.2f}</div><div class="metric-label">Avg Groups per User</div></div>'.format(stats['avg_group_per_user']), unsafe_allow_html=True)
-                with col2:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{:.2f}</div><div class="metric-label">Avg Accesses per User</div></div>'.format(stats['avg_access_per_user']), unsafe_allow_html=True)
-                with col3:
-                    st.markdown('<div class="metric-card"><div class="metric-value">{:.2f}</div><div class="metric-label">Avg Accesses per Group</div></div>'.format(stats['avg_access_per_group']), unsafe_allow_html=True)
-                
-                # Visualizations
-                st.markdown('<h2 class="sub-header">Visualizations</h2>', unsafe_allow_html=True)
-                
-                # First row of charts
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.plotly_chart(visualizations['group_distribution'], use_container_width=True)
-                with col2:
-                    st.plotly_chart(visualizations['access_distribution'], use_container_width=True)
-                
-                # Second row of charts
-                col1, col2 = st.columns(2)
-                with col1:
-                    if 'top_groups' in visualizations:
-                        st.plotly_chart(visualizations['top_groups'], use_container_width=True)
-                with col2:
-                    if 'top_accesses' in visualizations:
-                        st.plotly_chart(visualizations['top_accesses'], use_container_width=True)
-                
-                # Third row - pie chart
-                st.plotly_chart(visualizations['extra_access_pie'], use_container_width=True)
-                
-                # Public accesses section
-                st.markdown('<h2 class="sub-header">Public Access Rights (Default for All Users)</h2>', unsafe_allow_html=True)
-                
-                with st.container():
-                    st.markdown('<div class="card">', unsafe_allow_html=True)
-                    if public_accesses:
-                        st.markdown(f"**{len(public_accesses)} default access rights** are granted to all users via *PUBLIC:")
-                        st.write(", ".join(sorted(public_accesses)))
-                    else:
-                        st.markdown("No public access rights found.")
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Users with extra access section
-                st.markdown('<h2 class="sub-header">Users with Extra Access Rights</h2>', unsafe_allow_html=True)
-                
-                with st.container():
-                    if extra_accesses:
-                        st.markdown('<div class="warning-text">The following users have access rights beyond what their assigned groups provide (excluding public access).</div>', unsafe_allow_html=True)
-                        
-                        # Create a dataframe for better display
-                        extra_access_data = []
-                        for user, extra in extra_accesses.items():
-                            extra_access_data.append({
-                                'User': user,
-                                'Extra Accesses': ", ".join(sorted(extra)),
-                                'Extra Access Count': len(extra),
-                                'Assigned Groups': ", ".join(sorted(user_groups.get(user, []))),
-                                'Group Count': len(user_groups.get(user, [])),
-                                'Total Access Count': len(user_accesses.get(user, []))
-                            })
-                        
-                        extra_df = pd.DataFrame(extra_access_data)
-                        extra_df = extra_df.sort_values('Extra Access Count', ascending=False)
-                        
-                        # Display as an interactive table
-                        st.dataframe(extra_df, use_container_width=True)
-                        
-                        # Detailed expanders for each user
-                        for _, row in extra_df.iterrows():
-                            with st.expander(f"{row['User']} - {row['Extra Access Count']} extra access(es)"):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.markdown("**Extra Accesses:**")
-                                    st.markdown(row['Extra Accesses'])
-                                    
-                                    st.markdown("**Assigned Groups:**")
-                                    st.markdown(row['Assigned Groups'])
-                                
-                                with col2:
-                                    st.markdown("**All Actual Accesses:**")
-                                    all_accesses = ", ".join(sorted(user_accesses.get(row['User'], [])))
-                                    st.markdown(all_accesses)
-                                    
-                                    # Show public accesses for reference
-                                    st.markdown("**Public Accesses (Available to All):**")
-                                    st.markdown(", ".join(sorted(public_accesses)))
-                    else:
-                        st.markdown('<div class="info-text">No users found with extra access rights beyond their group permissions and public access.</div>', unsafe_allow_html=True)
-                
-                # Group-to-Access mapping section
-                st.markdown('<h2 class="sub-header">Group-to-Access Mapping</h2>', unsafe_allow_html=True)
-                
-                # Create a dataframe for better display
-                group_access_data = []
-                for group, accesses in group_accesses.items():
-                    group_access_data.append({
-                        'Group': group,
-                        'Access Count': len(accesses),
-                        'Users in Group': sum(1 for user_group in user_groups.values() if group in user_group)
-                    })
-                
-                group_df = pd.DataFrame(group_access_data)
-                group_df = group_df.sort_values(['Users in Group', 'Access Count'], ascending=False)
-                
-                # Display as an interactive table
-                st.dataframe(group_df, use_container_width=True)
-                
-                # Detailed expanders for each group
-                for group, accesses in group_accesses.items():
-                    users_in_group = sum(1 for user_group in user_groups.values() if group in user_group)
-                    with st.expander(f"{group} - {len(accesses)} access(es), {users_in_group} user(s)"):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown("**Access List:**")
-                            st.markdown(", ".join(sorted(accesses)))
-                        
-                        with col2:
-                            st.markdown("**Users in this Group:**")
-                            users_list = [user for user, groups in user_groups.items() if group in groups]
-                            st.markdown(", ".join(sorted(users_list)) if users_list else "No users assigned to this group")
-                
-                # User Access Analysis section
-                st.markdown('<h2 class="sub-header">User Access Analysis</h2>', unsafe_allow_html=True)
-                
-                # Create search functionality
-                search_user = st.text_input("Search for a specific user:")
-                
-                # Filter users based on search
-                filtered_users = [user for user in user_groups.keys() if search_user.lower() in user.lower()] if search_user else list(user_groups.keys())
-                
-                if filtered_users:
-                    # Create a dataframe for better display
-                    user_data = []
-                    for user in filtered_users:
-                        user_data.append({
-                            'User': user,
-                            'Group Count': len(user_groups.get(user, [])),
-                            'Access Count': len(user_accesses.get(user, [])),
-                            'Has Extra Access': user in extra_accesses,
-                            'Extra Access Count': len(extra_accesses.get(user, []))
-                        })
+                if analysis is not None:
+                    st.success("Files loaded successfully!")
                     
-                    user_df = pd.DataFrame(user_data)
-                    user_df = user_df.sort_values(['Has Extra Access', 'Access Count'], ascending=[False, False])
+                    # Charts are cached as resources rather than pickled with the analysis data
+                    analysis['visualizations'] = create_visualizations(
+                        analysis['user_groups'], analysis['user_accesses'], analysis['group_accesses'],
+                        analysis['extra_accesses'], analysis['public_accesses'], analysis['stats']
+                    )
+                    st.session_state['analysis'] = analysis
+                    st.session_state['analysis_files'] = uploaded_files
+                else:
+                    st.session_state.pop('analysis', None)
+                    st.error("Error loading CSV files. Please check the file format and try again.")
+        
+        analysis = st.session_state.get('analysis') if st.session_state.get('analysis_files') == uploaded_files else None
+        if analysis is not None:
+            group_users = analysis['group_users']
+            group_accesses = analysis['group_accesses']
+            public_accesses = analysis['public_accesses']
+            group_accesses_sorted = analysis['group_accesses_sorted']
+            public_accesses_sorted = analysis['public_accesses_sorted']
+            extra_accesses = analysis['extra_accesses']
+            stats = analysis['stats']
+            visualizations = analysis['visualizations']
+            extra_df = analysis['extra_df']
+            group_df = analysis['group_df']
+            user_df = analysis['user_df']
+            user_groups = analysis['user_groups']
+            user_accesses = analysis['user_accesses']
+            
+            # Display dashboard
+            st.markdown('<h2 class="sub-header">Dashboard Overview</h2>', unsafe_allow_html=True)
+            
+            # Key metrics
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Total Users", stats['total_users'])
+            col2.metric("Total Groups", stats['total_groups'])
+            col3.metric("Users with Extra Access", stats['users_with_extra_access'])
+            col4.metric("Public Accesses", stats['public_accesses'])
+            
+            # Second row of metrics
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Avg Groups per User", f"{stats['avg_group_per_user']:.2f}")
+            col2.metric("Avg Accesses per User", f"{stats['avg_access_per_user']:.2f}")
+            col3.metric("Avg Accesses per Group", f"{stats['avg_access_per_group']:.2f}")
+            
+            # Visualizations
+            st.markdown('<h2 class="sub-header">Visualizations</h2>', unsafe_allow_html=True)
+            
+            # First row of charts
+            col1, col2 = st.columns(2)
+            with col1:
+                st.altair_chart(visualizations['group_distribution'], use_container_width=True)
+            with col2:
+                st.altair_chart(visualizations['access_distribution'], use_container_width=True)
+            
+            # Second row of charts
+            col1, col2 = st.columns(2)
+            with col1:
+                if 'top_groups' in visualizations:
+                    st.altair_chart(visualizations['top_groups'], use_container_width=True)
+            with col2:
+                if 'top_accesses' in visualizations:
+                    st.altair_chart(visualizations['top_accesses'], use_container_width=True)
+            
+            # Third row - pie chart
+            st.altair_chart(visualizations['extra_access_pie'], use_container_width=True)
+            
+            # Public accesses section
+            st.markdown('<h2 class="sub-header">Public Access Rights (Default for All Users)</h2>', unsafe_allow_html=True)
+            
+            with st.container(border=True):
+                if public_accesses:
+                    st.markdown(f"**{len(public_accesses)} default access rights** are granted to all users via *PUBLIC:")
+                    st.write(", ".join(public_accesses_sorted))
+                else:
+                    st.markdown("No public access rights found.")
+            
+            # Users with extra access section
+            st.markdown('<h2 class="sub-header">Users with Extra Access Rights</h2>', unsafe_allow_html=True)
+            
+            with st.container():
+                if extra_accesses:
+                    st.markdown('<div class="warning-text">The following users have access rights beyond what their assigned groups provide (excluding public access).</div>', unsafe_allow_html=True)
                     
                     # Display as an interactive table
-                    st.dataframe(user_df, use_container_width=True)
+                    st.dataframe(extra_df, use_container_width=True)
+                    
+                    # Detail panel for a single selected user
+                    picked_extra_user = st.selectbox("Inspect a user with extra access:", extra_df['User'])
+                    picked_row = extra_df[extra_df['User'] == picked_extra_user].iloc[0]
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown("**Extra Accesses:**")
+                        st.markdown(picked_row['Extra Accesses'])
+                        
+                        st.markdown("**Assigned Groups:**")
+                        st.markdown(picked_row['Assigned Groups'])
                     
-                    # Detailed expanders for each user
-                    for user in user_df['User']:
-                        groups = user_groups.get(user, [])
-                        accesses = user_accesses.get(user, [])
-                        extra = extra_accesses.get(user, [])
+                    with col2:
+                        st.markdown("**All Actual Accesses:**")
+                        all_accesses = ", ".join(sorted(user_accesses.get(picked_extra_user, ())))
+                        st.markdown(all_accesses)
                         
-                        with st.expander(f"{user} - {len(groups)} group(s), {len(accesses)} access(es)"):
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.markdown("**Assigned Groups:**")
-                                st.markdown(", ".join(sorted(groups)) if groups else "No groups assigned")
-                                
-                                st.markdown("**Access Rights:**")
-                                st.markdown(", ".join(sorted(accesses)) if accesses else "No access rights")
-                            
-                            with col2:
-                                if user in extra_accesses:
-                                    st.markdown("**Extra Access Rights:**")
-                                    st.markdown(", ".join(sorted(extra)) if extra else "No extra access rights")
-                                
-                                # Calculate expected access from groups
-                                expected_access = set(public_accesses)  # Start with public access
-                                for group in groups:
-                                    if group in group_accesses:
-                                        expected_access.update(group_accesses[group])
-                                
-                                st.markdown("**Expected Access from Groups + Public:**")
-                                st.markdown(", ".join(sorted(expected_access)) if expected_access else "No expected access rights")
+                        # Show public accesses for reference
+                        st.markdown("**Public Accesses (Available to All):**")
+                        st.markdown(", ".join(public_accesses_sorted))
                 else:
-                    st.write("No users found matching your search criteria.")
-                
-                # Download section
-                st.markdown('<h2 class="sub-header">Export Results</h2>', unsafe_allow_html=True)
+                    st.markdown('<div class="info-text">No users found with extra access rights beyond their group permissions and public access.</div>', unsafe_allow_html=True)
+            
+            # Group-to-Access mapping section
+            st.markdown('<h2 class="sub-header">Group-to-Access Mapping</h2>', unsafe_allow_html=True)
+            
+            # Display as an interactive table
+            st.dataframe(group_df, use_container_width=True)
+            
+            # Detail panel for a single selected group
+            if group_accesses:
+                picked_group = st.selectbox("Inspect a group:", group_df['Group'])
+                accesses = group_accesses_sorted[picked_group]
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**Access List:**")
+                    st.markdown(", ".join(accesses))
                 
-                # Prepare data for export
-                export_data = io.StringIO()
+                with col2:
+                    st.markdown("**Users in this Group:**")
+                    users_list = group_users.get(picked_group, [])
+                    st.markdown(", ".join(sorted(users_list)) if users_list else "No users assigned to this group")
+            
+            # User Access Analysis section
+            st.markdown('<h2 class="sub-header">User Access Analysis</h2>', unsafe_allow_html=True)
+            
+            # Create search functionality
+            search_user = st.text_input("Search for a specific user:")
+            
+            # Filter users based on search
+            filtered_user_df = user_df[user_df['User'].str.contains(search_user, case=False, na=False, regex=False)] if search_user else user_df
+            
+            if not filtered_user_df.empty:
+                # Only the current page of users is rendered
+                page_count = math.ceil(len(filtered_user_df) / USERS_PER_PAGE)
+                page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) if page_count > 1 else 1
+                start = (page - 1) * USERS_PER_PAGE
+                page_user_df = filtered_user_df.iloc[start:start + USERS_PER_PAGE]
                 
-                # Extra accesses report
-                if extra_access_data:
-                    extra_df.to_csv(export_data, index=False)
-                    extra_csv = export_data.getvalue()
-                    st.download_button(
-                        label="Download Extra Access Report (CSV)",
-                        data=extra_csv,
-                        file_name="extra_access_report.csv",
-                        mime="text/csv"
-                    )
+                # One table for the whole page, with each user's precomputed detail strings alongside
+                page_details = format_user_details(
+                    list(page_user_df['User']), user_groups, user_accesses,
+                    analysis['expected_accesses'], analysis['extra_lookup'], public_accesses
+                )
+                page_view = page_user_df.join(page_details, on='User')
+                st.dataframe(
+                    page_view,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'Groups': st.column_config.TextColumn("Assigned Groups"),
+                        'Accesses': st.column_config.TextColumn("Access Rights"),
+                        'Extra Accesses': st.column_config.TextColumn("Extra Access Rights"),
+                        'Expected Accesses': st.column_config.TextColumn("Expected Access from Groups + Public"),
+                    },
+                )
+                st.caption(f"Showing users {start + 1}-{start + len(page_user_df)} of {len(filtered_user_df)}")
             else:
-                st.error("Error loading CSV files. Please check the file format and try again.")
+                st.write("No users found matching your search criteria.")
+            
+            # Download section
+            st.markdown('<h2 class="sub-header">Export Results</h2>', unsafe_allow_html=True)
+            
+            # Extra accesses report
+            if not extra_df.empty:
+                st.download_button(
+                    label="Download Extra Access Report (gzipped CSV)",
+                    data=analysis['extra_report'],
+                    file_name="extra_access_report.csv.gz",
+                    mime="application/gzip"
+                )
+        else:
+            st.info("Click **Analyze** to process the uploaded files.")
     else:
         # Welcome screen
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.markdown("""
-        ## Welcome to the User Access Analyzer
+        with st.container(border=True):
+            st.markdown("""
+            ## Welcome to the User Access Analyzer
         
-        This application helps you analyze user access rights and identify potential security issues:
+            This application helps you analyze user access rights and identify potential security issues:
         
-        1. **Upload the required files** using the sidebar
-        2. **Analyze access patterns** across your organization
-        3. **Identify users with extra access** beyond their assigned groups
-        4. **Visualize access distribution** with interactive charts
+            1. **Upload the required files** using the sidebar
+            2. **Analyze access patterns** across your organization
+            3. **Identify users with extra access** beyond their assigned groups
+            4. **Visualize access distribution** with interactive charts
         
-        ### Key Features:
-        - Identifies extra access rights beyond group permissions
-        - Accounts for *PUBLIC access as default for all users
-        - Provides detailed visualizations of access patterns
-        - Allows searching and filtering of users
-        - Exports results for further analysis
-        """)
-        st.markdown('</div>', unsafe_allow_html=True)
-    st.markdown("<div style='position: fixed; bottom: 0; width: 100%; text-align: center; font-size: 0.8em;'><p>Developed with ❤️ by Maitry Rawal</p></div>", unsafe_allow_html=True)
+            ### Key Features:
+            - Identifies extra access rights beyond group permissions
+            - Accounts for *PUBLIC access as default for all users
+            - Provides detailed visualizations of access patterns
+            - Allows searching and filtering of users
+            - Exports results for further analysis
+            """)
+    st.caption("Developed with ❤️ by Maitry Rawal")
 
 if __name__ == "__main__":
     main()